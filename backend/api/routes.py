@@ -47,7 +47,8 @@ def refresh_cache():
         200: {"message": "Cache cleared"}
     """
     # Clear cache using main app's cache mechanism
-    main_app._cache.clear()
+    with main_app._cache_lock:
+        main_app._cache.clear()
     main_app.logger.info("Cache cleared via API")
     return json_success({"message": "Cache cleared"})
 
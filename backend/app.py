@@ -9,14 +9,32 @@ from github.GithubException import (
     BadCredentialsException,
     RateLimitExceededException,
     GithubException,
+    UnknownObjectException,
 )
 import yaml
+import copy
+import hashlib
 import os
 import sys
 import time
 import logging
 import re
-from github_helpers import get_github_client, check_repo_access
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from github_helpers import (
+    get_github_client,
+    get_github_token_or_fallback,
+    check_repo_access,
+    github_api_call,
+    get_rate_limit_snapshot,
+)
+
+# Safe YAML loader: libyaml's C parser when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as YamlSafeLoader
+except ImportError:
+    from yaml import SafeLoader as YamlSafeLoader
 
 # Configure logging
 logging.basicConfig(
@@ -61,9 +79,9 @@ repo = None
 if GH_TOKEN:
     try:
         github = Github(GH_TOKEN)
+        # Fetching the repo validates the token and repo name in one call;
+        # SPECS_PATH itself is checked by /health, not on every boot
         repo = github.get_repo(GH_REPO)
-        # Test connectivity
-        repo.get_contents(SPECS_PATH, ref=WORKFLOW_BRANCH)
         logger.info(
             f"✓ Successfully connected to GitHub repo: {GH_REPO} (branch: {WORKFLOW_BRANCH}) using GH_TOKEN"
         )
@@ -81,30 +99,81 @@ else:
     )
 
 # Simple cache with 30-second TTL (demo usage has plenty of API quota)
-_cache = {}
+# Entries are stored as (content, expires_at) using the monotonic clock
+_cache: dict[str, tuple[object, float]] = {}
+_cache_lock = threading.Lock()  # Guards _cache and _spec_etags eviction
 CACHE_TTL = 30  # 30 seconds
+CACHE_MAX_ENTRIES = 512  # Pod list + one entry per viewed spec
+
+# spec.yml path -> (ETag, parsed spec), kept past CACHE_TTL for revalidation
+_spec_etags: dict[str, tuple[str, dict]] = {}
+
+# git blob SHA -> parsed spec (LRU), so identical bytes are parsed once
+SPEC_PARSE_MEMO_SIZE = 256
+_parsed_by_sha: OrderedDict[str, dict] = OrderedDict()
+_parsed_by_sha_lock = threading.Lock()
+
+# /health reuses its last healthy result while GitHub has answered recently
+# (spec fetches, discovery or a previous probe), instead of probing again
+HEALTH_FRESHNESS = 60  # seconds
+_github_last_ok = 0.0  # time.monotonic() of the last successful GitHub call
+_last_health = None  # Last GH_TOKEN /health payload; None after a failed probe
+
+
+def mark_github_ok():
+    """
+    Record that a GH_TOKEN GitHub call just succeeded (feeds /health).
+
+    Only call this for service-account calls: user tokens succeeding says
+    nothing about whether GH_TOKEN is still valid.
+    """
+    global _github_last_ok
+    _github_last_ok = time.monotonic()
+
+
+# Concurrent GitHub requests when walking customer directories
+DISCOVERY_WORKERS = 8
+
+# Lifecycle sort order for environments (unknown envs sort last)
+ENV_ORDER = {"dev": 0, "stg": 1, "prd": 2}
 
 
 def get_cached(key):
-    """Get cached value if not expired"""
-    if key in _cache:
-        content, timestamp = _cache[key]
-        age = time.time() - timestamp
-        if age < CACHE_TTL:
-            logger.debug(f"Cache hit: {key} (age: {age:.1f}s)")
+    """Get cached value if not expired (None on miss)"""
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is None:
+            return None
+
+        content, expires_at = entry
+        if time.monotonic() < expires_at:
+            logger.debug(f"Cache hit: {key}")
             return content
-        else:
-            logger.debug(f"Cache expired: {key} (age: {age:.1f}s)")
-            del _cache[key]
-    return None
+
+        logger.debug(f"Cache expired: {key}")
+        del _cache[key]
+        return None
 
 
 def set_cached(key, content):
-    """Store value in cache with current timestamp"""
-    _cache[key] = (content, time.time())
+    """Store value in cache until CACHE_TTL seconds from now"""
+    # Re-insert so dict order tracks write time, then evict the oldest
+    # writes once the cache is full
+    with _cache_lock:
+        _cache.pop(key, None)
+        while len(_cache) >= CACHE_MAX_ENTRIES:
+            del _cache[next(iter(_cache))]
+
+        _cache[key] = (content, time.monotonic() + CACHE_TTL)
     logger.debug(f"Cached: {key}")
 
 
+# Input validation patterns (compiled once; used with fullmatch so a trailing
+# newline can't slip past the way "$" allows)
+PATH_COMPONENT_RE = re.compile(r"[a-zA-Z0-9_-]+")
+INSTANCE_NAME_RE = re.compile(r"[a-z0-9-]+")
+
+
 def validate_path_component(value, param_name):
     """
     Validate URL path components to prevent path traversal and injection.
@@ -122,17 +191,13 @@ def validate_path_component(value, param_name):
     if not value or len(value) > 50:
         raise ValueError(f"{param_name} must be 1-50 characters")
 
-    # Alphanumeric, hyphen, underscore only
-    if not re.match(r"^[a-zA-Z0-9_-]+$", value):
+    # Alphanumeric, hyphen, underscore only. This also rules out path
+    # traversal, since ".", "/" and "\\" can never match.
+    if not PATH_COMPONENT_RE.fullmatch(value):
         raise ValueError(
             f"{param_name} contains invalid characters (use a-z, A-Z, 0-9, -, _ only)"
         )
 
-    # Prevent path traversal
-    if ".." in value or "/" in value or "\\" in value:
-        logger.warning(f"Path traversal attempt detected: {param_name}={value}")
-        raise ValueError(f"{param_name} contains path traversal attempt")
-
     return value
 
 
@@ -157,7 +222,7 @@ def validate_instance_name(value):
     if not value or len(value) > 30:
         raise ValueError("instance_name must be 1-30 characters")
 
-    if not re.match(r"^[a-z0-9-]+$", value):
+    if not INSTANCE_NAME_RE.fullmatch(value):
         raise ValueError(
             "instance_name must be lowercase letters, numbers, and hyphens only (no uppercase, no underscores, no spaces)"
         )
@@ -192,35 +257,127 @@ def generate_spec_yaml(customer, env, instance_name, waf_enabled):
     return yaml.dump(spec, default_flow_style=False, sort_keys=False)
 
 
-def fetch_spec(customer, env):
+def _parse_spec_blob(content):
+    """
+    Parse spec.yml bytes, memoized by git blob SHA.
+
+    A 200 whose bytes are unchanged (ETag mismatch across tokens, evicted
+    validator, or the same file reached via pre-warm and a page view) skips
+    the YAML parse. The SHA is computed locally the way git does, so the key
+    is content-addressed and never needs invalidating.
+
+    Args:
+        content: Raw spec.yml bytes
+
+    Returns:
+        Parsed YAML (dict for valid specs); shared, so never mutate it
+
+    Raises:
+        yaml.YAMLError: If the content is not valid YAML
+    """
+    sha = hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+    with _parsed_by_sha_lock:
+        spec = _parsed_by_sha.get(sha)
+        if spec is not None:
+            _parsed_by_sha.move_to_end(sha)
+            return spec
+
+    spec = yaml.load(content, Loader=YamlSafeLoader)
+
+    with _parsed_by_sha_lock:
+        _parsed_by_sha[sha] = spec
+        while len(_parsed_by_sha) > SPEC_PARSE_MEMO_SIZE:
+            _parsed_by_sha.popitem(last=False)
+    return spec
+
+
+def _remember_spec_etag(path, etag, spec):
+    """Keep the ETag and parsed spec for conditional re-fetches (bounded)."""
+    with _cache_lock:
+        _spec_etags.pop(path, None)
+        while len(_spec_etags) >= CACHE_MAX_ENTRIES:
+            del _spec_etags[next(iter(_spec_etags))]
+        _spec_etags[path] = (etag, spec)
+
+
+def fetch_spec(customer, env, token=None):
     """
     Fetch and parse spec.yml from GitHub for a specific pod.
     Uses user token from cookie, falls back to GH_TOKEN if available.
+    GH_TOKEN reads are cached for CACHE_TTL seconds; user-token reads always
+    go to GitHub so it checks that token's access. Either way a re-fetch
+    sends If-None-Match, and a 304 (which doesn't count against the rate
+    limit) reuses the previously parsed spec.
 
     Args:
         customer: Customer name (validated)
         env: Environment name (validated)
+        token: Explicit GitHub token (default: user cookie or GH_TOKEN)
 
     Returns:
-        dict: Parsed spec.yml content
+        dict: Parsed spec.yml content (a private copy: the cached and
+            memoized specs are shared across requests and pods)
 
     Raises:
-        Exception: If spec not found or YAML parse fails
+        401: If there is no user token and no GH_TOKEN fallback
+        GithubException: If GitHub returns an error (e.g. 404 not found)
+        ValueError: If YAML parse fails
     """
     path = f"{SPECS_PATH}/{customer}/{env}/spec.yml"
 
+    # Anonymous requests get a 401 here, before any cache is consulted
+    if token is None:
+        token, is_service = get_github_token_or_fallback()
+    else:
+        is_service = token == GH_TOKEN
+
+    # The spec cache is shared by all callers, so only the service account
+    # uses it: a user token (possibly invalid, or without access to the repo)
+    # must not be answered from a spec fetched with someone else's token
+    cache_key = f"spec:{path}"
+    if is_service:
+        cached = get_cached(cache_key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+
     try:
         logger.info(f"Fetching spec: {path}")
 
-        # Get authenticated GitHub client (user token or GH_TOKEN fallback)
-        github_client = get_github_client(require_user=False)
-        repo_obj = github_client.get_repo(GH_REPO)
+        # Raw media type returns the file body itself (no base64 JSON
+        # envelope); conditional request if we've seen this file before
+        validator = _spec_etags.get(path)
+        headers = {"Accept": "application/vnd.github.raw"}
+        if validator:
+            headers["If-None-Match"] = validator[0]
+
+        response = github_api_call(
+            f"/repos/{GH_REPO}/contents/{path}",
+            token=token,
+            params={"ref": WORKFLOW_BRANCH},
+            headers=headers,
+        )
 
-        content = repo_obj.get_contents(path, ref=WORKFLOW_BRANCH)
-        spec_yaml = content.decoded_content.decode("utf-8")
-        spec = yaml.safe_load(spec_yaml)
-        logger.info(f"✓ Successfully parsed spec for {customer}/{env}")
-        return spec
+        if response.status_code == 304:
+            spec = validator[1]
+            logger.info(f"✓ Spec unchanged for {customer}/{env} (304)")
+        elif response.status_code == 200:
+            spec = _parse_spec_blob(response.content)
+            logger.info(f"✓ Successfully parsed spec for {customer}/{env}")
+
+            etag = response.headers.get("ETag")
+            if etag:
+                _remember_spec_etag(path, etag, spec)
+        else:
+            try:
+                data = response.json()
+            except ValueError:
+                data = {"message": response.text}
+            raise GithubException(response.status_code, data, dict(response.headers))
+
+        if is_service:
+            mark_github_ok()
+            set_cached(cache_key, spec)
+        return copy.deepcopy(spec)
 
     except yaml.YAMLError as e:
         logger.error(f"YAML parse error in {path}: {e}")
@@ -231,68 +388,189 @@ def fetch_spec(customer, env):
         raise
 
 
-def list_all_pods():
+def _pods_from_tree(repo_obj):
+    """
+    Discover pods from a single recursive Git tree listing.
+
+    Args:
+        repo_obj: PyGithub Repository object
+
+    Returns:
+        list: [{"customer": str, "env": str}, ...] (unsorted), or None if
+        GitHub truncated the tree and the listing may be incomplete
+    """
+    tree = repo_obj.get_git_tree(WORKFLOW_BRANCH, recursive=True)
+    if tree.raw_data.get("truncated"):
+        logger.warning("Git tree listing truncated, falling back to directory walk")
+        return None
+
+    prefix = f"{SPECS_PATH}/"
+    pods = []
+    for entry in tree.tree:
+        if entry.type != "blob" or not entry.path.startswith(prefix):
+            continue
+
+        # Match exactly <SPECS_PATH>/<customer>/<env>/spec.yml
+        parts = entry.path[len(prefix) :].split("/")
+        if len(parts) == 3 and parts[2] == "spec.yml":
+            pods.append({"customer": parts[0], "env": parts[1]})
+            logger.debug(f"  Found pod: {parts[0]}/{parts[1]}")
+
+    return pods
+
+
+def _customer_pods(repo_obj, customer_name):
+    """
+    List the envs of one customer that contain a spec.yml.
+
+    Args:
+        repo_obj: PyGithub Repository object
+        customer_name: Customer directory name
+
+    Returns:
+        list: [{"customer": str, "env": str}, ...] (empty on listing errors)
+    """
+    pods = []
+    try:
+        envs = repo_obj.get_contents(
+            f"{SPECS_PATH}/{customer_name}", ref=WORKFLOW_BRANCH
+        )
+        for env in envs:
+            if env.type != "dir":
+                continue
+
+            # Check if spec.yml exists
+            try:
+                repo_obj.get_contents(
+                    f"{SPECS_PATH}/{customer_name}/{env.name}/spec.yml",
+                    ref=WORKFLOW_BRANCH,
+                )
+                pods.append({"customer": customer_name, "env": env.name})
+                logger.debug(f"  Found pod: {customer_name}/{env.name}")
+            except UnknownObjectException:
+                # spec.yml doesn't exist in this env, skip
+                pass
+    except Exception as e:
+        logger.warning(f"Error listing envs for {customer_name}: {e}")
+
+    return pods
+
+
+def _pods_from_contents(repo_obj):
+    """
+    Discover pods by walking directories with the Contents API.
+
+    Needs one request per customer and per env, so it is only used when the
+    Git tree listing is truncated. Customers are walked concurrently since
+    each request is network-bound.
+
+    Args:
+        repo_obj: PyGithub Repository object
+
+    Returns:
+        list: [{"customer": str, "env": str}, ...] (unsorted)
+    """
+    customers = repo_obj.get_contents(SPECS_PATH, ref=WORKFLOW_BRANCH)
+    customer_names = [c.name for c in customers if c.type == "dir"]
+    if not customer_names:
+        return []
+
+    pods = []
+    with ThreadPoolExecutor(max_workers=DISCOVERY_WORKERS) as executor:
+        for customer_pods in executor.map(
+            lambda name: _customer_pods(repo_obj, name), customer_names
+        ):
+            pods.extend(customer_pods)
+
+    return pods
+
+
+def list_all_pods(token=None):
     """
     Dynamically discover pods by walking GitHub repo structure.
-    Uses user token from cookie, falls back to GH_TOKEN if available.
+    Uses user token from cookie, falls back to GH_TOKEN if available
+    (or the explicit token, for callers outside a request).
     Returns list of {"customer": str, "env": str} dicts.
     Sorted: alphabetically by customer, lifecycle order by env (dev, stg, prd).
     """
     cache_key = f"pods:{SPECS_PATH}"
     cached = get_cached(cache_key)
-    if cached:
+    if cached is not None:
         return cached
 
     logger.info(f"Discovering pods in {SPECS_PATH}...")
-    pods = []
+
+    # User token or GH_TOKEN fallback, unless the caller passed one
+    if token is None:
+        token, is_service = get_github_token_or_fallback()
+    else:
+        is_service = token == GH_TOKEN
 
     try:
-        # Get authenticated GitHub client (user token or GH_TOKEN fallback)
-        github_client = get_github_client(require_user=False)
+        github_client = Github(token)
         repo_obj = github_client.get_repo(GH_REPO)
 
-        customers = repo_obj.get_contents(SPECS_PATH, ref=WORKFLOW_BRANCH)
-
-        for customer in customers:
-            if customer.type != "dir":
-                continue
-
-            try:
-                envs = repo_obj.get_contents(
-                    f"{SPECS_PATH}/{customer.name}", ref=WORKFLOW_BRANCH
-                )
-                for env in envs:
-                    if env.type != "dir":
-                        continue
-
-                    # Check if spec.yml exists
-                    try:
-                        repo_obj.get_contents(
-                            f"{SPECS_PATH}/{customer.name}/{env.name}/spec.yml",
-                            ref=WORKFLOW_BRANCH,
-                        )
-                        pods.append({"customer": customer.name, "env": env.name})
-                        logger.debug(f"  Found pod: {customer.name}/{env.name}")
-                    except:
-                        # spec.yml doesn't exist in this env, skip
-                        pass
-            except Exception as e:
-                logger.warning(f"Error listing envs for {customer.name}: {e}")
-                continue
+        # One recursive tree request instead of one request per directory
+        pods = _pods_from_tree(repo_obj)
+        if pods is None:
+            pods = _pods_from_contents(repo_obj)
 
     except Exception as e:
         logger.error(f"Error discovering pods: {e}")
         raise
 
     # Sort: customer alphabetically, then env in lifecycle order
-    env_order = {"dev": 0, "stg": 1, "prd": 2}
-    pods.sort(key=lambda p: (p["customer"], env_order.get(p["env"], 99)))
+    pods.sort(key=lambda p: (p["customer"], ENV_ORDER.get(p["env"], 99)))
 
     logger.info(f"✓ Discovered {len(pods)} pods")
+    if is_service:
+        mark_github_ok()
     set_cached(cache_key, pods)
     return pods
 
 
+def cached_pods_or_empty():
+    """
+    Return the last discovered pod list without calling GitHub.
+
+    Used for the pod sidebar on error pages: an error (often a GitHub
+    failure or rate limit) must not trigger another round of discovery.
+
+    Returns:
+        list: Cached pods from list_all_pods(), or [] if none are cached
+    """
+    cached = get_cached(f"pods:{SPECS_PATH}")
+    return cached if cached is not None else []
+
+
+def render_error(status_code, error_type, title, message, show_pods=True):
+    """
+    Render the shared error page.
+
+    Args:
+        status_code: HTTP status code to return
+        error_type: Template error category (validation, not_found, ...)
+        title: Error page heading
+        message: Error details shown to the user
+        show_pods: Include the pod list sidebar (from cache only, never
+            triggering discovery; see cached_pods_or_empty)
+
+    Returns:
+        tuple: (rendered HTML, status_code)
+    """
+    return (
+        render_template(
+            "error.html.j2",
+            error_type=error_type,
+            error_title=title,
+            error_message=message,
+            show_pods=show_pods,
+            pods=cached_pods_or_empty() if show_pods else [],
+        ),
+        status_code,
+    )
+
+
 # Register API blueprint
 from api import api_blueprint
 
@@ -311,8 +589,8 @@ app.register_blueprint(auth_blueprint)
 @app.route("/refresh")
 def refresh():
     """Clear cache and redirect to home page"""
-    global _cache
-    _cache = {}
+    with _cache_lock:
+        _cache.clear()
     logger.info("Cache cleared by user refresh")
     return redirect("/")
 
@@ -336,31 +614,16 @@ def view_pod(customer, env):
     except ValueError as e:
         # Validation error - show error page with details
         logger.warning(f"Validation error for /pod/{customer}/{env}: {e}")
-        return (
-            render_template(
-                "error.html.j2",
-                error_type="validation",
-                error_title="Invalid Request",
-                error_message=str(e),
-                show_pods=True,
-                pods=list_all_pods(),
-            ),
-            400,
-        )
+        return render_error(400, "validation", "Invalid Request", str(e))
 
     except Exception as e:
         # Spec not found or other error
         logger.error(f"Error viewing pod {customer}/{env}: {e}")
-        return (
-            render_template(
-                "error.html.j2",
-                error_type="not_found",
-                error_title="Pod Not Found",
-                error_message=f"Could not find spec for {customer}/{env}",
-                show_pods=True,
-                pods=list_all_pods(),
-            ),
+        return render_error(
             404,
+            "not_found",
+            "Pod Not Found",
+            f"Could not find spec for {customer}/{env}",
         )
 
 
@@ -411,17 +674,11 @@ def deploy():
                 repo_obj.get_contents(path, ref=WORKFLOW_BRANCH)
                 # File exists - reject with 409 Conflict
                 logger.warning(f"Attempted to create existing pod: {customer}/{env}")
-                pods = list_all_pods()
-                return (
-                    render_template(
-                        "error.html.j2",
-                        error_type="conflict",
-                        error_title="Pod Already Exists",
-                        error_message=f"Pod {customer}/{env} already exists. Choose a different customer/environment combination or edit the existing pod.",
-                        show_pods=True,
-                        pods=pods,
-                    ),
+                return render_error(
                     409,
+                    "conflict",
+                    "Pod Already Exists",
+                    f"Pod {customer}/{env} already exists. Choose a different customer/environment combination or edit the existing pod.",
                 )
             except:
                 # File doesn't exist - good to proceed
@@ -448,16 +705,12 @@ def deploy():
 
         except GithubException as e:
             logger.error(f"Failed to create branch {branch_name}: {e}")
-            return (
-                render_template(
-                    "error.html.j2",
-                    error_type="api_error",
-                    error_title="Branch Creation Failed",
-                    error_message=f"Could not create deployment branch: {e.data.get('message', str(e)) if hasattr(e, 'data') else str(e)}",
-                    show_pods=False,
-                    pods=[],
-                ),
+            return render_error(
                 503,
+                "api_error",
+                "Branch Creation Failed",
+                f"Could not create deployment branch: {e.data.get('message', str(e)) if hasattr(e, 'data') else str(e)}",
+                show_pods=False,
             )
 
         # Generate spec.yml content
@@ -496,16 +749,12 @@ def deploy():
 
         except GithubException as e:
             logger.error(f"Failed to write spec.yml: {e}")
-            return (
-                render_template(
-                    "error.html.j2",
-                    error_type="api_error",
-                    error_title="Spec Update Failed",
-                    error_message=f"Could not write spec.yml: {e.data.get('message', str(e)) if hasattr(e, 'data') else str(e)}",
-                    show_pods=False,
-                    pods=[],
-                ),
+            return render_error(
                 503,
+                "api_error",
+                "Spec Update Failed",
+                f"Could not write spec.yml: {e.data.get('message', str(e)) if hasattr(e, 'data') else str(e)}",
+                show_pods=False,
             )
 
         # Create Pull Request
@@ -543,16 +792,12 @@ Review the terraform plan output below before merging.
 
         except GithubException as e:
             logger.error(f"Failed to create PR: {e}")
-            return (
-                render_template(
-                    "error.html.j2",
-                    error_type="api_error",
-                    error_title="Pull Request Failed",
-                    error_message=f"Could not create pull request: {e.data.get('message', str(e)) if hasattr(e, 'data') else str(e)}",
-                    show_pods=False,
-                    pods=[],
-                ),
+            return render_error(
                 503,
+                "api_error",
+                "Pull Request Failed",
+                f"Could not create pull request: {e.data.get('message', str(e)) if hasattr(e, 'data') else str(e)}",
+                show_pods=False,
             )
 
         # Success - return PR details
@@ -577,77 +822,75 @@ Review the terraform plan output below before merging.
     except ValueError as e:
         # Validation error
         logger.warning(f"Validation error in /deploy: {e}")
-        return (
-            render_template(
-                "error.html.j2",
-                error_type="validation",
-                error_title="Invalid Input",
-                error_message=str(e),
-                show_pods=True,
-                pods=list_all_pods(),
-            ),
-            400,
-        )
+        return render_error(400, "validation", "Invalid Input", str(e))
 
     except KeyError as e:
         # Missing form field
         logger.error(f"Missing form field: {e}")
-        return (
-            render_template(
-                "error.html.j2",
-                error_type="validation",
-                error_title="Missing Required Field",
-                error_message=f"Required field missing: {e}",
-                show_pods=False,
-                pods=[],
-            ),
+        return render_error(
             400,
+            "validation",
+            "Missing Required Field",
+            f"Required field missing: {e}",
+            show_pods=False,
         )
 
     except GithubException as e:
         # GitHub API error (not caught by specific handlers above)
         logger.error(f"GitHub API error: {e}")
-        return (
-            render_template(
-                "error.html.j2",
-                error_type="api_error",
-                error_title="GitHub API Error",
-                error_message=f"Failed to trigger deployment: {e.data.get('message', str(e)) if hasattr(e, 'data') else str(e)}",
-                show_pods=False,
-                pods=[],
-            ),
+        return render_error(
             503,
+            "api_error",
+            "GitHub API Error",
+            f"Failed to trigger deployment: {e.data.get('message', str(e)) if hasattr(e, 'data') else str(e)}",
+            show_pods=False,
         )
 
     except Exception as e:
         # Generic error
         logger.error(f"Deployment failed: {e}")
-        return (
-            render_template(
-                "error.html.j2",
-                error_type="server_error",
-                error_title="Server Error",
-                error_message=f"Failed to process form: {e}",
-                show_pods=False,
-                pods=[],
-            ),
+        return render_error(
             500,
+            "server_error",
+            "Server Error",
+            f"Failed to process form: {e}",
+            show_pods=False,
         )
 
 
 @app.route("/health")
 def health():
     """Health check: validate GitHub connectivity and show rate limit"""
+    global _last_health
+
+    # Fast path: GitHub answered recently, so report the last healthy result
+    # with rate-limit numbers sniffed from recent responses (no API calls).
+    # Only for GH_TOKEN callers: a user token has its own scopes and quota.
+    user_token = request.cookies.get("github_token")
+    if (
+        not user_token
+        and _last_health is not None
+        and time.monotonic() - _github_last_ok < HEALTH_FRESHNESS
+    ):
+        payload = dict(_last_health)
+        snapshot = get_rate_limit_snapshot()
+        if snapshot:
+            payload["rate_limit"] = snapshot
+        return jsonify(payload)
+
+    rate_limit = None
     try:
         # Get authenticated GitHub client (user token or GH_TOKEN fallback)
         github_client = get_github_client(require_user=False)
-        repo_obj = github_client.get_repo(GH_REPO)
+
+        # Get rate limit info first (doesn't consume quota) so the
+        # rate-limited path below can reuse it instead of re-fetching
+        rate_limit = github_client.get_rate_limit()
 
         # Test connectivity
+        repo_obj = github_client.get_repo(GH_REPO)
         repo_obj.get_contents(SPECS_PATH, ref=WORKFLOW_BRANCH)
 
-        # Get rate limit info
-        rate_limit = github_client.get_rate_limit()
         remaining = rate_limit.core.remaining
         limit = rate_limit.core.limit
         reset_timestamp = rate_limit.core.reset.timestamp()
@@ -661,37 +904,47 @@ def health():
         except:
             pass
 
-        return jsonify(
-            {
-                "status": "healthy",
-                "github": "connected",
-                "repo": GH_REPO,
-                "scopes": {
-                    "repo": True,  # If we got here, we have repo scope
-                    "workflow": has_workflow_scope,
-                },
-                "rate_limit": {
-                    "remaining": remaining,
-                    "limit": limit,
-                    "reset_at": int(reset_timestamp),
-                },
-            }
-        )
+        payload = {
+            "status": "healthy",
+            "github": "connected",
+            "repo": GH_REPO,
+            "scopes": {
+                "repo": True,  # If we got here, we have repo scope
+                "workflow": has_workflow_scope,
+            },
+            "rate_limit": {
+                "remaining": remaining,
+                "limit": limit,
+                "reset_at": int(reset_timestamp),
+            },
+        }
+        if not user_token:
+            _last_health = payload
+            mark_github_ok()
+        return jsonify(payload)
 
     except RateLimitExceededException as e:
-        reset_time = github.get_rate_limit().core.reset
+        _last_health = None
+        # Reuse the rate limit fetched above; otherwise read the reset time
+        # from the error response headers (no extra API call either way)
+        if rate_limit is not None:
+            reset_at = int(rate_limit.core.reset.timestamp())
+        else:
+            reset_header = (e.headers or {}).get("x-ratelimit-reset")
+            reset_at = int(reset_header) if reset_header else None
         return (
             jsonify(
                 {
                     "status": "unhealthy",
                     "error": "Rate limit exceeded",
-                    "reset_at": int(reset_time.timestamp()),
+                    "reset_at": reset_at,
                 }
             ),
             503,
         )
 
     except Exception as e:
+        _last_health = None
         logger.error(f"Health check failed: {e}")
         # Don't expose exception details to external users
         return jsonify({"status": "unhealthy", "error": "Service unavailable"}), 503
@@ -736,16 +989,15 @@ def service_unavailable_error(error):
     )
 
 
-@app.context_processor
-def utility_processor():
-    """Add utility functions to all templates"""
+# Tailwind color per environment badge (unknown envs are gray)
+ENV_BADGE_COLORS = {"dev": "green", "stg": "yellow", "prd": "red"}
 
-    def env_badge_color(env):
-        """Return Tailwind color classes for environment badges"""
-        colors = {"dev": "green", "stg": "yellow", "prd": "red"}
-        return colors.get(env, "gray")
 
-    return dict(env_badge_color=env_badge_color)
+@app.template_filter()
+@app.template_global()
+def env_badge_color(env):
+    """Return Tailwind color classes for environment badges"""
+    return ENV_BADGE_COLORS.get(env, "gray")
 
 
 @app.route("/", defaults={"path": ""})
@@ -785,10 +1037,73 @@ def serve_spa(path):
     return app.send_static_file("index.html")
 
 
+def _prewarm_spec(pod, token):
+    """Fetch one pod's spec into the cache; returns True on success."""
+    try:
+        fetch_spec(pod["customer"], pod["env"], token=token)
+        return True
+    except Exception as e:
+        # A broken spec must not stop the rest from warming
+        logger.warning(f"Pre-warm skipped {pod['customer']}/{pod['env']}: {e}")
+        return False
+
+
+def prewarm_cache(token):
+    """
+    Discover pods and fetch every spec.yml in parallel.
+
+    Fills the pod/spec cache and the ETag validators, so the first page
+    views are served from memory and later refreshes are cheap 304s.
+    Runs in a background thread; failures are logged, never raised.
+
+    Args:
+        token: GitHub token to warm with (the GH_TOKEN service account)
+    """
+    started = time.monotonic()
+    try:
+        pods = list_all_pods(token=token)
+
+        with ThreadPoolExecutor(max_workers=DISCOVERY_WORKERS) as executor:
+            warmed = sum(executor.map(lambda pod: _prewarm_spec(pod, token), pods))
+
+        logger.info(
+            f"✓ Pre-warmed {warmed}/{len(pods)} specs in {time.monotonic() - started:.1f}s"
+        )
+    except Exception as e:
+        logger.warning(f"Cache pre-warm failed: {e}")
+
+
+def start_cache_prewarm():
+    """
+    Start prewarm_cache() in a daemon thread, once per serving process.
+
+    Called from gunicorn's post_worker_init hook and from the dev server,
+    not at import, so tests, the reloader's parent process and one-off
+    imports don't hit GitHub. Only runs with GH_TOKEN (no user cookie
+    exists outside a request) and unless PREWARM_CACHE=0.
+
+    Returns:
+        threading.Thread: The started thread, or None if pre-warm is off
+    """
+    if not GH_TOKEN or os.environ.get("PREWARM_CACHE", "1") != "1":
+        return None
+
+    thread = threading.Thread(
+        target=prewarm_cache, args=(GH_TOKEN,), name="cache-prewarm", daemon=True
+    )
+    thread.start()
+    return thread
+
+
 if __name__ == "__main__":
     # Only enable debug mode if explicitly set via environment variable
     # Never enable in production
     debug_mode = os.environ.get("FLASK_DEBUG", "0") == "1"
     host = os.environ.get("FLASK_HOST", "0.0.0.0")  # 0.0.0.0 = all interfaces
     port = int(os.environ.get("FLASK_PORT", "5000"))
+
+    # With the debug reloader, only the child process (which serves) warms
+    if not debug_mode or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_cache_prewarm()
+
     app.run(debug=debug_mode, host=host, port=port)
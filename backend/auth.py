@@ -119,18 +119,18 @@ def callback():
             token_url, data=data, headers={"Accept": "application/json"}
         )
         token_data = response.json()
-        access_token = token_data.get("access_token")
-
-        if not access_token:
-            error = token_data.get("error", "unknown")
-            error_desc = token_data.get("error_description", "No access token returned")
-            logger.error(f"Failed to get access token: {error} - {error_desc}")
-            abort(400, f"Failed to authenticate with GitHub: {error_desc}")
-
     except Exception as e:
         logger.error(f"Error exchanging code for token: {e}")
         abort(500, "Failed to complete authentication. Please try again.")
 
+    # Checked outside the try so this 400 isn't turned into a 500 above
+    access_token = token_data.get("access_token")
+    if not access_token:
+        error = token_data.get("error", "unknown")
+        error_desc = token_data.get("error_description", "No access token returned")
+        logger.error(f"Failed to get access token: {error} - {error_desc}")
+        abort(400, f"Failed to authenticate with GitHub: {error_desc}")
+
     # Validate token with GitHub API
     user_data = validate_github_token(access_token)
     if not user_data:
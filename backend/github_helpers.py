@@ -11,11 +11,66 @@ Provides:
 from flask import request, abort
 from github import Github, GithubException
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Shared HTTP session for GitHub REST calls: keeps TLS connections to
+# api.github.com alive across requests/threads instead of reconnecting per call.
+# GET/HEAD requests are retried on transient gateway errors; the final
+# response is returned as-is so callers still see the real status.
+_session = requests.Session()
+_session.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=(502, 503, 504),
+            # Never replay writes (PUT/POST/DELETE) through a general helper
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            raise_on_status=False,
+        ),
+    ),
+)
+
+# Per-attempt timeout (seconds) for github_api_call, matching the order of
+# PyGithub's 15s default so a stalled GitHub call can't pin a worker thread
+GITHUB_TIMEOUT = 10
+
+# Latest X-RateLimit-* values seen on a GH_TOKEN response from github_api_call
+# (user tokens have their own quotas, so their headers are not recorded)
+_rate_limit: dict[str, int] = {}
+
+
+def _record_rate_limit(response):
+    """Remember GitHub's rate-limit headers from a response (free to read)."""
+    headers = response.headers
+    if "x-ratelimit-remaining" in headers:
+        try:
+            _rate_limit.update(
+                remaining=int(headers["x-ratelimit-remaining"]),
+                limit=int(headers["x-ratelimit-limit"]),
+                reset_at=int(headers["x-ratelimit-reset"]),
+            )
+        except (KeyError, ValueError):
+            pass
+
+
+def get_rate_limit_snapshot():
+    """
+    Get the most recent GH_TOKEN rate-limit headers seen by github_api_call.
+
+    Returns:
+        dict: {"remaining", "limit", "reset_at"}, or {} if none seen yet
+    """
+    return dict(_rate_limit)
+
 
 def get_github_token_or_fallback():
     """
@@ -77,7 +132,7 @@ def get_github_client(require_user=False):
         return Github(token)
 
 
-def github_api_call(endpoint, method="GET", **kwargs):
+def github_api_call(endpoint, method="GET", token=None, **kwargs):
     """
     Make GitHub REST API call with user's token.
 
@@ -87,7 +142,11 @@ def github_api_call(endpoint, method="GET", **kwargs):
     Args:
         endpoint: API endpoint path (e.g., '/user', '/repos/owner/repo')
         method: HTTP method (GET, POST, PUT, DELETE)
-        **kwargs: Additional arguments passed to requests.request()
+        token: Explicit token to use instead of the request's cookie/GH_TOKEN
+            (for work outside a request, e.g. the cache pre-warm)
+        **kwargs: Additional arguments passed to requests.Session.request()
+            (an "Accept" entry in headers overrides the default v3 JSON;
+            timeout defaults to GITHUB_TIMEOUT)
 
     Returns:
         requests.Response: Response object
@@ -95,14 +154,20 @@ def github_api_call(endpoint, method="GET", **kwargs):
     Raises:
         401: If token invalid or missing
     """
-    token, is_service = get_github_token_or_fallback()
+    if token is None:
+        token, is_service = get_github_token_or_fallback()
+    else:
+        is_service = token == os.environ.get("GH_TOKEN")
 
     headers = kwargs.pop("headers", {})
     headers["Authorization"] = f"token {token}"
-    headers["Accept"] = "application/vnd.github.v3+json"
+    headers.setdefault("Accept", "application/vnd.github.v3+json")
 
     url = f"https://api.github.com{endpoint}"
-    response = requests.request(method, url, headers=headers, **kwargs)
+    kwargs.setdefault("timeout", GITHUB_TIMEOUT)
+    response = _session.request(method, url, headers=headers, **kwargs)
+    if is_service:
+        _record_rate_limit(response)
 
     if response.status_code == 401:
         logger.warning(f"GitHub token invalid/expired for endpoint: {endpoint}")
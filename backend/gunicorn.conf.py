@@ -0,0 +1,41 @@
+"""
+Gunicorn configuration for the Spec Editor container.
+
+Usage:
+    gunicorn -c gunicorn.conf.py app:app
+
+Request handling is I/O-bound (GitHub API calls), so a threaded worker lets
+one process keep many requests in flight while they wait on the network.
+"""
+
+import os
+
+bind = (
+    f"{os.environ.get('FLASK_HOST', '0.0.0.0')}:{os.environ.get('FLASK_PORT', '5000')}"
+)
+
+# One worker: the pod/spec cache is in-process, and without FLASK_SECRET_KEY
+# each worker would generate its own session key (breaking OAuth logins)
+workers = int(os.environ.get("GUNICORN_WORKERS", "1"))
+
+# Threads overlap GitHub round-trips (gthread keeps the stdlib socket/thread
+# model that the discovery and pre-warm thread pools rely on)
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "8"))
+
+# Don't preload: each worker imports the app itself and then starts its own
+# cache pre-warm (threads started in the master would not survive the fork)
+preload_app = False
+
+# GitHub calls can be slow under load; keep well above the retry backoff
+timeout = 60
+keepalive = 5
+
+accesslog = "-"
+
+
+def post_worker_init(worker):
+    """Warm this worker's pod/spec cache in the background once it's ready."""
+    from app import start_cache_prewarm
+
+    start_cache_prewarm()
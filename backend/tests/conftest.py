@@ -0,0 +1,13 @@
+"""
+Shared pytest configuration for backend tests.
+
+Puts the backend directory on sys.path once per session so test modules can
+import app, auth, github_helpers and api directly.
+"""
+
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
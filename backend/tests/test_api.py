@@ -4,26 +4,39 @@ Unit tests for API endpoints.
 Tests all /api/* routes with mocked GitHub API calls.
 """
 
+import time
 import pytest
-from unittest.mock import Mock, patch, MagicMock
-from github import GithubException
+from unittest.mock import ANY, DEFAULT, Mock, patch
+from github import GithubException, RateLimitExceededException
+from werkzeug.exceptions import Unauthorized
 
-# Import app for testing
-import sys
-import os
-
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Import app for testing (backend dir is put on sys.path by conftest.py)
 import app
 
+# Canned responses shared across tests (never mutated by the code under test)
+SPEC_YAML = "metadata:\n  customer: acme\n"
+DEPLOYMENT_RESULT = {
+    "branch": "deploy-acme-dev-123456",
+    "pr_url": "https://github.com/test/repo/pull/1",
+    "pr_number": 1,
+}
 
-@pytest.fixture
+
+@pytest.fixture(scope="module")
 def client():
-    """Flask test client."""
+    """Flask test client (shared across the module; tests don't mutate app state)."""
     app.app.config["TESTING"] = True
     with app.app.test_client() as client:
         yield client
 
 
+@pytest.fixture(autouse=True)
+def reset_health_state(monkeypatch):
+    """Start every test without a remembered /health result."""
+    monkeypatch.setattr(app, "_last_health", None)
+    monkeypatch.setattr(app, "_github_last_ok", 0.0)
+
+
 @pytest.fixture
 def mock_github_client():
     """Mock GitHub client for tests."""
@@ -33,6 +46,42 @@ def mock_github_client():
         yield mock_client
 
 
+@pytest.fixture
+def create_pod_mocks():
+    """Patch spec generation, the GitHub client and deployment for POST /api/pod."""
+    # routes.py imports these names directly, so patch them where they're used
+    with patch("app.generate_spec_yaml", return_value=SPEC_YAML) as mock_generate:
+        with patch("api.routes.get_github_client"), patch(
+            "api.routes.create_pod_deployment"
+        ) as mock_deploy:
+            yield mock_generate, mock_deploy
+
+
+@pytest.fixture(scope="module")
+def health_github_mocks():
+    """Pre-built (mock_client, mock_repo) pair for a healthy GitHub connection."""
+    mock_github = Mock()
+    mock_repo = Mock()
+    mock_github.get_repo.return_value = mock_repo
+
+    # Mock GitHub connectivity check
+    mock_repo.get_contents.return_value = Mock()
+
+    # Mock rate limit
+    mock_rate_limit = Mock()
+    mock_rate_limit.core.remaining = 5000
+    mock_rate_limit.core.limit = 5000
+    mock_rate_limit.core.reset.timestamp.return_value = 1234567890
+    mock_github.get_rate_limit.return_value = mock_rate_limit
+
+    # Mock workflows
+    mock_workflows = Mock()
+    mock_workflows.totalCount = 1
+    mock_repo.get_workflows.return_value = mock_workflows
+
+    return mock_github, mock_repo
+
+
 class TestGetPods:
     """Tests for GET /api/pods"""
 
@@ -105,6 +154,14 @@ class TestGetPod:
         data = response.get_json()
         assert "error" in data
 
+    def test_get_pod_trailing_newline_rejected(self, client):
+        """Should return 400 when a path component ends in a newline"""
+        response = client.get("/api/pod/acme%0A/dev")
+
+        assert response.status_code == 400
+        data = response.get_json()
+        assert "invalid characters" in data["error"]
+
     @patch("app.fetch_spec")
     def test_get_pod_github_404(self, mock_fetch, mock_github_client, client):
         """Should return 404 when GitHub returns 404"""
@@ -120,18 +177,10 @@ class TestGetPod:
 class TestCreatePod:
     """Tests for POST /api/pod"""
 
-    @patch("api.helpers.create_pod_deployment")
-    @patch("app.generate_spec_yaml")
-    def test_create_pod_success(
-        self, mock_generate, mock_deploy, mock_github_client, client
-    ):
+    def test_create_pod_success(self, create_pod_mocks, mock_github_client, client):
         """Should create branch and PR for valid pod"""
-        mock_generate.return_value = "metadata:\n  customer: acme\n"
-        mock_deploy.return_value = {
-            "branch": "deploy-acme-dev-123456",
-            "pr_url": "https://github.com/test/repo/pull/1",
-            "pr_number": 1,
-        }
+        _, mock_deploy = create_pod_mocks
+        mock_deploy.return_value = DEPLOYMENT_RESULT
 
         response = client.post(
             "/api/pod",
@@ -148,44 +197,26 @@ class TestCreatePod:
         assert "pr_url" in data
         assert data["pr_number"] == 1
 
-    def test_create_pod_missing_customer(self, client):
-        """Should return 400 if customer missing"""
-        response = client.post(
-            "/api/pod", json={"env": "dev", "spec": {"instance_name": "test"}}
-        )
-
-        assert response.status_code == 400
-        data = response.get_json()
-        assert "customer" in data["error"].lower()
-
-    def test_create_pod_missing_env(self, client):
-        """Should return 400 if env missing"""
-        response = client.post(
-            "/api/pod", json={"customer": "acme", "spec": {"instance_name": "test"}}
-        )
-
-        assert response.status_code == 400
-        data = response.get_json()
-        assert "env" in data["error"].lower()
-
-    def test_create_pod_missing_spec(self, client):
-        """Should return 400 if spec missing"""
-        response = client.post("/api/pod", json={"customer": "acme", "env": "dev"})
+    @pytest.mark.parametrize(
+        "payload, missing_field",
+        [
+            ({"env": "dev", "spec": {"instance_name": "test"}}, "customer"),
+            ({"customer": "acme", "spec": {"instance_name": "test"}}, "env"),
+            ({"customer": "acme", "env": "dev"}, "spec"),
+            (
+                {"customer": "acme", "env": "dev", "spec": {"waf_enabled": True}},
+                "instance_name",
+            ),
+        ],
+        ids=["customer", "env", "spec", "instance_name"],
+    )
+    def test_create_pod_missing_field(self, client, payload, missing_field):
+        """Should return 400 naming the missing required field"""
+        response = client.post("/api/pod", json=payload)
 
         assert response.status_code == 400
         data = response.get_json()
-        assert "spec" in data["error"].lower()
-
-    def test_create_pod_missing_instance_name(self, client):
-        """Should return 400 if instance_name missing from spec"""
-        response = client.post(
-            "/api/pod",
-            json={"customer": "acme", "env": "dev", "spec": {"waf_enabled": True}},
-        )
-
-        assert response.status_code == 400
-        data = response.get_json()
-        assert "instance_name" in data["error"].lower()
+        assert missing_field in data["error"].lower()
 
     def test_create_pod_invalid_json(self, client):
         """Should return 400 for invalid JSON"""
@@ -227,11 +258,9 @@ class TestCreatePod:
         data = response.get_json()
         assert "error" in data
 
-    @patch("api.helpers.create_pod_deployment")
-    @patch("app.generate_spec_yaml")
-    def test_create_pod_github_error(self, mock_generate, mock_deploy, client):
+    def test_create_pod_github_error(self, create_pod_mocks, client):
         """Should return 500 on GitHub API error"""
-        mock_generate.return_value = "metadata:\n  customer: acme\n"
+        _, mock_deploy = create_pod_mocks
         mock_deploy.side_effect = GithubException(500, "API error", None)
 
         response = client.post(
@@ -247,16 +276,10 @@ class TestCreatePod:
         data = response.get_json()
         assert "error" in data
 
-    @patch("api.helpers.create_pod_deployment")
-    @patch("app.generate_spec_yaml")
-    def test_create_pod_with_commit_message(self, mock_generate, mock_deploy, client):
+    def test_create_pod_with_commit_message(self, create_pod_mocks, client):
         """Should pass custom commit message to deployment"""
-        mock_generate.return_value = "metadata:\n  customer: acme\n"
-        mock_deploy.return_value = {
-            "branch": "deploy-acme-dev-123456",
-            "pr_url": "https://github.com/test/repo/pull/1",
-            "pr_number": 1,
-        }
+        _, mock_deploy = create_pod_mocks
+        mock_deploy.return_value = DEPLOYMENT_RESULT
 
         response = client.post(
             "/api/pod",
@@ -270,52 +293,389 @@ class TestCreatePod:
 
         assert response.status_code == 200
         # Verify commit_message was passed to create_pod_deployment
-        mock_deploy.assert_called_once()
-        call_args = mock_deploy.call_args
-        assert call_args[0][4] == "Custom deployment message"  # 5th positional arg
+        mock_deploy.assert_called_once_with(
+            ANY,
+            app.GH_REPO,
+            app.SPECS_PATH,
+            "acme",
+            "dev",
+            SPEC_YAML,
+            "Custom deployment message",
+        )
 
 
 class TestHealthEndpoint:
     """Tests for GET /health (existing endpoint, verify JSON format)"""
 
-    @patch("app.repo")
-    @patch("app.github")
-    def test_health_success(self, mock_github, mock_repo, client):
+    def test_health_success(self, health_github_mocks, client):
         """Should return healthy status with GitHub info"""
-        # Mock GitHub connectivity check
-        mock_repo.get_contents.return_value = Mock()
-
-        # Mock rate limit
-        mock_rate_limit = Mock()
-        mock_rate_limit.core.remaining = 5000
-        mock_rate_limit.core.limit = 5000
-        mock_rate_limit.core.reset.timestamp.return_value = 1234567890
-        mock_github.get_rate_limit.return_value = mock_rate_limit
+        mock_github, mock_repo = health_github_mocks
 
-        # Mock workflows
-        mock_workflows = Mock()
-        mock_workflows.totalCount = 1
-        mock_repo.get_workflows.return_value = mock_workflows
-
-        response = client.get("/health")
+        with patch("app.get_github_client", return_value=mock_github):
+            response = client.get("/health")
 
         assert response.status_code == 200
         data = response.get_json()
         assert "status" in data
         assert data["status"] == "healthy"
         assert "github" in data
+        assert data["rate_limit"] == {
+            "remaining": 5000,
+            "limit": 5000,
+            "reset_at": 1234567890,
+        }
+        mock_repo.get_contents.assert_called_with(
+            app.SPECS_PATH, ref=app.WORKFLOW_BRANCH
+        )
 
-    @patch("app.repo")
-    @patch("app.github")
-    def test_health_github_error(self, mock_github, mock_repo, client):
+    def test_health_github_error(self, client):
         """Should return unhealthy status on GitHub error"""
-        # Mock GitHub connectivity failure
-        mock_repo.get_contents.side_effect = Exception("Connection failed")
+        with patch("app.get_github_client") as mock_get_client:
+            # Mock GitHub connectivity failure
+            mock_repo = mock_get_client.return_value.get_repo.return_value
+            mock_repo.get_contents.side_effect = Exception("Connection failed")
 
-        response = client.get("/health")
+            response = client.get("/health")
 
         assert response.status_code == 503
         data = response.get_json()
         assert "status" in data
         assert data["status"] == "unhealthy"
         assert "error" in data
+
+    def test_health_fresh_result_skips_github(self, client):
+        """Should reuse the last healthy result while GitHub answered recently"""
+        last_health = {"status": "healthy", "github": "connected", "repo": "r"}
+        snapshot = {"remaining": 4999, "limit": 5000, "reset_at": 1234567890}
+
+        with patch.multiple(
+            "app",
+            _last_health=last_health,
+            _github_last_ok=time.monotonic(),
+            get_rate_limit_snapshot=Mock(return_value=snapshot),
+            get_github_client=DEFAULT,
+        ) as mocks:
+            response = client.get("/health")
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data["status"] == "healthy"
+        assert data["rate_limit"] == snapshot
+        mocks["get_github_client"].assert_not_called()
+
+    def test_health_failed_probe_clears_last_result(self, client):
+        """Should keep probing after a failure instead of replaying old health"""
+        app._last_health = {"status": "healthy"}
+
+        with patch("app.get_github_client") as mock_get_client:
+            mock_get_client.side_effect = Exception("Connection failed")
+            first = client.get("/health")
+            app.mark_github_ok()  # e.g. a spec fetch succeeds meanwhile
+            second = client.get("/health")
+
+        assert first.status_code == second.status_code == 503
+        assert mock_get_client.call_count == 2
+
+    def test_health_user_token_skips_fast_path(self, client):
+        """Should probe with the caller's token rather than reuse GH_TOKEN health"""
+        app._last_health = {"status": "healthy"}
+        app.mark_github_ok()
+
+        client.set_cookie("github_token", "user_token")
+        try:
+            with patch("app.get_github_client") as mock_get_client:
+                mock_get_client.side_effect = Exception("Bad credentials")
+                response = client.get("/health")
+        finally:
+            client.delete_cookie("github_token")
+
+        assert response.status_code == 503
+        mock_get_client.assert_called_once_with(require_user=False)
+
+    def test_health_user_token_success_does_not_refresh(self, contents_api, client):
+        """Should still probe GH_TOKEN after only user-token calls succeeded"""
+        app._last_health = {"status": "healthy"}
+        contents_api.return_value = contents_response(200, SPEC_YAML)
+
+        with patch(
+            "app.get_github_token_or_fallback", return_value=("user_token", False)
+        ):
+            app.fetch_spec("acme", "dev")
+
+        with patch("app.get_github_client") as mock_get_client:
+            mock_get_client.side_effect = Exception("Bad credentials")
+            response = client.get("/health")
+
+        assert response.status_code == 503
+        mock_get_client.assert_called_once_with(require_user=False)
+
+    def test_health_rate_limited_reuses_rate_limit(self, client):
+        """Should report reset time without fetching the rate limit twice"""
+        with patch("app.get_github_client") as mock_get_client:
+            mock_client = mock_get_client.return_value
+            mock_client.get_rate_limit.return_value.core.reset.timestamp.return_value = (
+                1234567890
+            )
+            mock_client.get_repo.side_effect = RateLimitExceededException(
+                403, {"message": "API rate limit exceeded"}, {}
+            )
+
+            response = client.get("/health")
+
+        assert response.status_code == 503
+        data = response.get_json()
+        assert data["error"] == "Rate limit exceeded"
+        assert data["reset_at"] == 1234567890
+        mock_client.get_rate_limit.assert_called_once_with()
+
+
+def tree_entry(path, entry_type="blob"):
+    """Build a mock Git tree element."""
+    entry = Mock()
+    entry.path = path
+    entry.type = entry_type
+    return entry
+
+
+@pytest.fixture
+def app_repo():
+    """Patch the GitHub client used by app helpers and yield its repo mock."""
+    app._cache.clear()
+    with patch("app.Github") as mock_github, patch(
+        "app.get_github_token_or_fallback", return_value=("service_token", True)
+    ):
+        mock_repo = Mock()
+        mock_github.return_value.get_repo.return_value = mock_repo
+        yield mock_repo
+    app._cache.clear()
+
+
+class TestListAllPods:
+    """Tests for pod discovery in list_all_pods()"""
+
+    def test_discovers_pods_from_single_tree_call(self, app_repo):
+        """Should find spec.yml files from one recursive tree listing"""
+        prefix = app.SPECS_PATH
+        tree = Mock()
+        tree.raw_data = {"truncated": False}
+        tree.tree = [
+            tree_entry(f"{prefix}/acme/prd/spec.yml"),
+            tree_entry(f"{prefix}/acme/dev/spec.yml"),
+            tree_entry(f"{prefix}/acme/dev", "tree"),
+            tree_entry(f"{prefix}/acme/stg/main.tf"),
+            tree_entry(f"{prefix}/acme/spec.yml"),
+            tree_entry(f"{prefix}/acme/dev/modules/spec.yml"),
+            tree_entry("other/beta/dev/spec.yml"),
+        ]
+        app_repo.get_git_tree.return_value = tree
+
+        pods = app.list_all_pods()
+
+        assert pods == [
+            {"customer": "acme", "env": "dev"},
+            {"customer": "acme", "env": "prd"},
+        ]
+        app_repo.get_git_tree.assert_called_once_with(
+            app.WORKFLOW_BRANCH, recursive=True
+        )
+        app_repo.get_contents.assert_not_called()
+
+    def test_falls_back_to_directory_walk_when_truncated(self, app_repo):
+        """Should walk directories when the tree listing is truncated"""
+        app_repo.get_git_tree.return_value.raw_data = {"truncated": True}
+
+        customer = Mock(type="dir")
+        customer.name = "acme"
+        env = Mock(type="dir")
+        env.name = "dev"
+        app_repo.get_contents.side_effect = [[customer], [env], Mock()]
+
+        pods = app.list_all_pods()
+
+        assert pods == [{"customer": "acme", "env": "dev"}]
+        assert app_repo.get_contents.call_count == 3
+
+
+def contents_response(status_code, text=None, etag=None):
+    """Build a mock GitHub contents API response."""
+    response = Mock()
+    response.status_code = status_code
+    response.headers = {"ETag": etag} if etag else {}
+    response.content = text.encode() if text is not None else b""
+    response.json.return_value = {"message": "Not Found"}
+    return response
+
+
+@pytest.fixture
+def contents_api():
+    """Patch the GitHub REST call used by fetch_spec, with empty caches."""
+    app._cache.clear()
+    app._spec_etags.clear()
+    app._parsed_by_sha.clear()
+    with patch("app.github_api_call") as mock_call, patch(
+        "app.get_github_token_or_fallback", return_value=("service_token", True)
+    ):
+        yield mock_call
+    app._cache.clear()
+    app._spec_etags.clear()
+    app._parsed_by_sha.clear()
+
+
+class TestAppCache:
+    """Tests for the in-memory spec/pod cache"""
+
+    def test_fetch_spec_served_from_cache(self, contents_api):
+        """Should fetch and parse spec.yml once within the TTL"""
+        contents_api.return_value = contents_response(200, SPEC_YAML, etag='"v1"')
+
+        first = app.fetch_spec("acme", "dev")
+        second = app.fetch_spec("acme", "dev")
+
+        assert first == second == {"metadata": {"customer": "acme"}}
+        contents_api.assert_called_once_with(
+            f"/repos/{app.GH_REPO}/contents/{app.SPECS_PATH}/acme/dev/spec.yml",
+            token="service_token",
+            params={"ref": app.WORKFLOW_BRANCH},
+            headers={"Accept": "application/vnd.github.raw"},
+        )
+
+    def test_fetch_spec_revalidates_with_etag(self, contents_api):
+        """Should send If-None-Match after the TTL and reuse the spec on 304"""
+        contents_api.return_value = contents_response(200, SPEC_YAML, etag='"v1"')
+        first = app.fetch_spec("acme", "dev")
+
+        app._cache.clear()  # Simulate TTL expiry
+        contents_api.return_value = contents_response(304)
+        second = app.fetch_spec("acme", "dev")
+
+        assert second == first
+        assert contents_api.call_args.kwargs["headers"] == {
+            "Accept": "application/vnd.github.raw",
+            "If-None-Match": '"v1"',
+        }
+
+    def test_fetch_spec_parses_identical_content_once(self, contents_api):
+        """Should reuse the parsed spec for unchanged bytes (same blob SHA)"""
+        contents_api.return_value = contents_response(200, SPEC_YAML)
+
+        with patch("app.yaml.load", wraps=app.yaml.load) as mock_load:
+            first = app.fetch_spec("acme", "dev")
+            app._cache.clear()  # Simulate TTL expiry; no ETag to revalidate
+            second = app.fetch_spec("acme", "dev")
+
+        assert second == first
+        assert contents_api.call_count == 2
+        mock_load.assert_called_once()
+
+    def test_fetch_spec_returns_private_copies(self, contents_api):
+        """Should not let a caller's edits leak into the cached spec"""
+        contents_api.return_value = contents_response(200, SPEC_YAML, etag='"v1"')
+
+        first = app.fetch_spec("acme", "dev")
+        first["metadata"]["customer"] = "mutated"
+        second = app.fetch_spec("acme", "dev")
+
+        assert second == {"metadata": {"customer": "acme"}}
+        assert app._spec_etags[f"{app.SPECS_PATH}/acme/dev/spec.yml"][1] == second
+
+    def test_fetch_spec_not_found_raises_github_exception(self, contents_api):
+        """Should raise GithubException(404) so routes can return 404"""
+        contents_api.return_value = contents_response(404)
+
+        with pytest.raises(GithubException) as exc_info:
+            app.fetch_spec("acme", "dev")
+
+        assert exc_info.value.status == 404
+
+    def test_fetch_spec_cache_requires_credentials(self, contents_api):
+        """Should not serve a cached spec to a caller without any token"""
+        contents_api.return_value = contents_response(200, SPEC_YAML)
+        app.fetch_spec("acme", "dev")
+
+        with patch(
+            "app.get_github_token_or_fallback", side_effect=Unauthorized()
+        ), pytest.raises(Unauthorized):
+            app.fetch_spec("acme", "dev")
+
+        contents_api.assert_called_once()
+
+    def test_fetch_spec_cache_not_shared_with_user_tokens(self, contents_api):
+        """Should send a user's token to GitHub even when GH_TOKEN cached the spec"""
+        contents_api.return_value = contents_response(200, SPEC_YAML)
+        app.fetch_spec("acme", "dev")
+
+        contents_api.side_effect = Unauthorized()
+        with patch(
+            "app.get_github_token_or_fallback", return_value=("garbage", False)
+        ), pytest.raises(Unauthorized):
+            app.fetch_spec("acme", "dev")
+
+        assert contents_api.call_count == 2
+        assert contents_api.call_args.kwargs["token"] == "garbage"
+
+    def test_set_cached_evicts_oldest_when_full(self):
+        """Should keep at most CACHE_MAX_ENTRIES entries"""
+        app._cache.clear()
+        try:
+            with patch("app.CACHE_MAX_ENTRIES", 2):
+                app.set_cached("a", 1)
+                app.set_cached("b", 2)
+                app.set_cached("a", 3)  # Rewrite makes "b" the oldest
+                app.set_cached("c", 4)
+
+            assert app.get_cached("b") is None
+            assert app.get_cached("a") == 3
+            assert app.get_cached("c") == 4
+        finally:
+            app._cache.clear()
+
+    def test_cached_pods_or_empty_never_calls_github(self, app_repo):
+        """Should return cached pods (or []) without triggering discovery"""
+        assert app.cached_pods_or_empty() == []
+
+        pods = [{"customer": "acme", "env": "dev"}]
+        app.set_cached(f"pods:{app.SPECS_PATH}", pods)
+
+        assert app.cached_pods_or_empty() == pods
+        app_repo.get_git_tree.assert_not_called()
+        app_repo.get_contents.assert_not_called()
+
+    @patch("app.fetch_spec")
+    @patch("app.list_all_pods")
+    def test_prewarm_cache_fetches_all_specs(self, mock_list_pods, mock_fetch):
+        """Should fetch every discovered spec and tolerate per-pod failures"""
+        mock_list_pods.return_value = [
+            {"customer": "acme", "env": "dev"},
+            {"customer": "acme", "env": "prd"},
+        ]
+        mock_fetch.side_effect = [{"ok": True}, ValueError("bad YAML")]
+
+        app.prewarm_cache("service_token")  # Must not raise
+
+        mock_list_pods.assert_called_once_with(token="service_token")
+        assert sorted(c.args for c in mock_fetch.call_args_list) == [
+            ("acme", "dev"),
+            ("acme", "prd"),
+        ]
+        assert {c.kwargs["token"] for c in mock_fetch.call_args_list} == {
+            "service_token"
+        }
+
+    @patch("app.threading.Thread")
+    def test_start_cache_prewarm_uses_gh_token(self, mock_thread, monkeypatch):
+        """Should pre-warm with GH_TOKEN, and not at all without it"""
+        monkeypatch.setattr(app, "GH_TOKEN", None)
+        assert app.start_cache_prewarm() is None
+        mock_thread.assert_not_called()
+
+        monkeypatch.setattr(app, "GH_TOKEN", "service_token")
+        monkeypatch.setenv("PREWARM_CACHE", "1")
+        app.start_cache_prewarm()
+
+        mock_thread.assert_called_once_with(
+            target=app.prewarm_cache,
+            args=("service_token",),
+            name="cache-prewarm",
+            daemon=True,
+        )
+        mock_thread.return_value.start.assert_called_once_with()
@@ -10,10 +10,8 @@ Tests:
 
 import pytest
 from unittest.mock import Mock, patch
-import sys
 import os
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import app
 
 
@@ -11,22 +11,25 @@ Tests:
 import pytest
 from unittest.mock import Mock, patch
 from flask import Flask
-from github import GithubException
-import sys
-import os
+from github import Github, GithubException
+from github.AuthenticatedUser import AuthenticatedUser
+from github.Repository import Repository
+
+import github_helpers
 
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from github_helpers import (
     get_github_token_or_fallback,
     get_user_token_required,
     get_github_client,
     github_api_call,
     check_repo_access,
+    GITHUB_TIMEOUT,
+    get_rate_limit_snapshot,
     validate_github_token,
 )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def app():
     """Flask app for request context."""
     app = Flask(__name__)
@@ -39,39 +42,35 @@ class TestTokenExtraction:
 
     def test_get_token_from_cookie(self, app):
         """Should extract token from cookie"""
-        with app.test_request_context():
-            with app.test_client() as client:
-                client.set_cookie("github_token", "user_token_123")
-                with client:
-                    client.get("/")
-                    token, is_service = get_github_token_or_fallback()
-                    assert token == "user_token_123"
-                    assert is_service is False
-
-    @patch.dict(os.environ, {"GH_TOKEN": "service_token_456"})
-    def test_fallback_to_gh_token(self, app):
+        with app.test_request_context(
+            "/", headers={"Cookie": "github_token=user_token_123"}
+        ):
+            token, is_service = get_github_token_or_fallback()
+            assert token == "user_token_123"
+            assert is_service is False
+
+    def test_fallback_to_gh_token(self, app, monkeypatch):
         """Should fallback to GH_TOKEN if no cookie"""
+        monkeypatch.setenv("GH_TOKEN", "service_token_456")
         with app.test_request_context():
             token, is_service = get_github_token_or_fallback()
             assert token == "service_token_456"
             assert is_service is True
 
-    @patch.dict(os.environ, {"GH_TOKEN": ""})
-    def test_no_token_available_aborts(self, app):
+    def test_no_token_available_aborts(self, app, monkeypatch):
         """Should abort 401 if no token available"""
+        monkeypatch.setenv("GH_TOKEN", "")
         with app.test_request_context():
             with pytest.raises(Exception):  # Flask abort raises werkzeug exception
                 get_github_token_or_fallback()
 
     def test_get_user_token_required_success(self, app):
         """Should return user token from cookie"""
-        with app.test_request_context():
-            with app.test_client() as client:
-                client.set_cookie("github_token", "user_token_123")
-                with client:
-                    client.get("/")
-                    token = get_user_token_required()
-                    assert token == "user_token_123"
+        with app.test_request_context(
+            "/", headers={"Cookie": "github_token=user_token_123"}
+        ):
+            token = get_user_token_required()
+            assert token == "user_token_123"
 
     def test_get_user_token_required_no_cookie(self, app):
         """Should abort 401 if no cookie (no fallback)"""
@@ -86,18 +85,16 @@ class TestGithubClient:
     @patch("github_helpers.Github")
     def test_get_client_with_user_token(self, mock_github, app):
         """Should create client with user token"""
-        with app.test_request_context():
-            with app.test_client() as client:
-                client.set_cookie("github_token", "user_token")
-                with client:
-                    client.get("/")
-                    get_github_client(require_user=False)
-                    mock_github.assert_called_with("user_token")
+        with app.test_request_context(
+            "/", headers={"Cookie": "github_token=user_token"}
+        ):
+            get_github_client(require_user=False)
+            mock_github.assert_called_with("user_token")
 
     @patch("github_helpers.Github")
-    @patch.dict(os.environ, {"GH_TOKEN": "service_token"})
-    def test_get_client_with_fallback(self, mock_github, app):
+    def test_get_client_with_fallback(self, mock_github, app, monkeypatch):
         """Should create client with GH_TOKEN fallback"""
+        monkeypatch.setenv("GH_TOKEN", "service_token")
         with app.test_request_context():
             get_github_client(require_user=False)
             mock_github.assert_called_with("service_token")
@@ -105,51 +102,116 @@ class TestGithubClient:
     @patch("github_helpers.Github")
     def test_get_client_require_user(self, mock_github, app):
         """Should only accept user token when require_user=True"""
-        with app.test_request_context():
-            with app.test_client() as client:
-                client.set_cookie("github_token", "user_token")
-                with client:
-                    client.get("/")
-                    get_github_client(require_user=True)
-                    mock_github.assert_called_with("user_token")
+        with app.test_request_context(
+            "/", headers={"Cookie": "github_token=user_token"}
+        ):
+            get_github_client(require_user=True)
+            mock_github.assert_called_with("user_token")
 
 
 class TestGithubApiCall:
     """Tests for github_api_call wrapper"""
 
-    @patch("github_helpers.requests.request")
+    @patch("github_helpers._session.request")
     def test_api_call_success(self, mock_request, app):
         """Should make API call with user token"""
         mock_response = Mock()
         mock_response.status_code = 200
         mock_request.return_value = mock_response
 
-        with app.test_request_context():
-            with app.test_client() as client:
-                client.set_cookie("github_token", "user_token")
-                with client:
-                    client.get("/")
-                    response = github_api_call("/user")
-
-                    assert response.status_code == 200
-                    mock_request.assert_called_once()
-                    call_kwargs = mock_request.call_args[1]
-                    assert call_kwargs["headers"]["Authorization"] == "token user_token"
-
-    @patch("github_helpers.requests.request")
+        with app.test_request_context(
+            "/", headers={"Cookie": "github_token=user_token"}
+        ):
+            response = github_api_call("/user")
+
+            assert response.status_code == 200
+            mock_request.assert_called_once()
+            call_kwargs = mock_request.call_args[1]
+            assert call_kwargs["headers"]["Authorization"] == "token user_token"
+
+    @patch("github_helpers._session.request")
+    def test_api_call_accept_override(self, mock_request, app):
+        """Should keep a caller-supplied Accept header"""
+        mock_request.return_value = Mock(status_code=200)
+
+        with app.test_request_context(
+            "/", headers={"Cookie": "github_token=user_token"}
+        ):
+            github_api_call(
+                "/repos/o/r/contents/f",
+                headers={"Accept": "application/vnd.github.raw"},
+            )
+
+        call_kwargs = mock_request.call_args[1]
+        assert call_kwargs["headers"]["Accept"] == "application/vnd.github.raw"
+
+    @patch("github_helpers._session.request")
+    def test_api_call_default_timeout(self, mock_request, app):
+        """Should pass a default timeout unless the caller sets one"""
+        mock_request.return_value = Mock(status_code=200)
+
+        with app.test_request_context(
+            "/", headers={"Cookie": "github_token=user_token"}
+        ):
+            github_api_call("/user")
+            github_api_call("/user", timeout=3)
+
+        first, second = mock_request.call_args_list
+        assert first[1]["timeout"] == GITHUB_TIMEOUT
+        assert second[1]["timeout"] == 3
+
+    @patch("github_helpers._session.request")
+    def test_api_call_records_service_rate_limit_only(
+        self, mock_request, app, monkeypatch
+    ):
+        """Should track rate-limit headers for GH_TOKEN calls, not user tokens"""
+        monkeypatch.setenv("GH_TOKEN", "service_token")
+        monkeypatch.setattr(github_helpers, "_rate_limit", {})
+
+        def response(remaining):
+            return Mock(
+                status_code=200,
+                headers={
+                    "x-ratelimit-remaining": str(remaining),
+                    "x-ratelimit-limit": "5000",
+                    "x-ratelimit-reset": "1234567890",
+                },
+            )
+
+        mock_request.return_value = response(4000)
+        with app.test_request_context("/"):
+            github_api_call("/user")
+
+        mock_request.return_value = response(10)
+        with app.test_request_context(
+            "/", headers={"Cookie": "github_token=user_token"}
+        ):
+            github_api_call("/user")
+
+        assert get_rate_limit_snapshot() == {
+            "remaining": 4000,
+            "limit": 5000,
+            "reset_at": 1234567890,
+        }
+
+    @patch("github_helpers._session.request")
     def test_api_call_401_aborts(self, mock_request, app):
         """Should abort on 401 response"""
         mock_response = Mock()
         mock_response.status_code = 401
         mock_request.return_value = mock_response
 
-        with app.test_request_context():
-            with app.test_client() as client:
-                client.set_cookie("github_token", "invalid_token")
-                with client:
-                    client.get("/")
-                    with pytest.raises(Exception):
-                        github_api_call("/user")
+        with app.test_request_context(
+            "/", headers={"Cookie": "github_token=invalid_token"}
+        ):
+            with pytest.raises(Exception):
+                github_api_call("/user")
+
+    def test_session_retries_only_idempotent_methods(self):
+        """Should never replay writes on a 502/503/504"""
+        adapter = github_helpers._session.get_adapter("https://api.github.com")
+
+        assert adapter.max_retries.allowed_methods == {"GET", "HEAD"}
 
 
 class TestCheckRepoAccess:
@@ -157,8 +219,8 @@ class TestCheckRepoAccess:
 
     def test_public_repo_access(self, app):
         """Should allow access to public repo"""
-        mock_client = Mock()
-        mock_repo = Mock()
+        mock_client = Mock(spec=Github)
+        mock_repo = Mock(spec=Repository)
         mock_repo.private = False
         mock_client.get_repo.return_value = mock_repo
 
@@ -168,12 +230,12 @@ class TestCheckRepoAccess:
 
     def test_private_trakrf_repo_member(self, app):
         """Should allow trakrf member to access private trakrf repo"""
-        mock_client = Mock()
-        mock_repo = Mock()
+        mock_client = Mock(spec=Github)
+        mock_repo = Mock(spec=Repository)
         mock_repo.private = True
         mock_client.get_repo.return_value = mock_repo
 
-        mock_user = Mock()
+        mock_user = Mock(spec=AuthenticatedUser)
         mock_user.login = "member_user"
         mock_client.get_user.return_value = mock_user
 
@@ -187,12 +249,12 @@ class TestCheckRepoAccess:
 
     def test_private_trakrf_repo_non_member(self, app):
         """Should deny non-member access to private trakrf repo"""
-        mock_client = Mock()
-        mock_repo = Mock()
+        mock_client = Mock(spec=Github)
+        mock_repo = Mock(spec=Repository)
         mock_repo.private = True
         mock_client.get_repo.return_value = mock_repo
 
-        mock_user = Mock()
+        mock_user = Mock(spec=AuthenticatedUser)
         mock_user.login = "external_user"
         mock_client.get_user.return_value = mock_user
 
@@ -208,7 +270,7 @@ class TestCheckRepoAccess:
 
     def test_repo_not_found(self, app):
         """Should abort 404 if repo doesn't exist"""
-        mock_client = Mock()
+        mock_client = Mock(spec=Github)
         mock_client.get_repo.side_effect = GithubException(
             404, {"message": "Not Found"}, None
         )
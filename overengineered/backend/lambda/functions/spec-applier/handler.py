@@ -23,7 +23,7 @@ from github_client import (
     BranchExistsError,
     PullRequestExistsError,
 )
-from spec_parser.change_detector import check_destructive_changes, Severity
+from spec_parser.change_detector import check_destructive_changes
 from spec_parser.parser import SpecParser
 from spec_parser.exceptions import ValidationError, ParseError
 from security_wrapper import secure_handler
@@ -257,16 +257,6 @@ def lambda_handler(event, context):
         }
 
 
-def _severity_emoji(severity) -> str:
-    """Map Severity enum to emoji indicator"""
-    emoji_map = {
-        Severity.INFO: "ℹ️",
-        Severity.WARNING: "⚠️",
-        Severity.CRITICAL: "🔴",
-    }
-    return emoji_map.get(severity, "•")
-
-
 def generate_pr_description(old_spec: dict, new_spec: dict, warnings: list) -> str:
     """
     Generate formatted PR description with warnings from change_detector.
@@ -282,10 +272,7 @@ def generate_pr_description(old_spec: dict, new_spec: dict, warnings: list) -> s
     # Build warnings section
     if warnings:
         warnings_md = "\n".join(
-            [
-                f"{_severity_emoji(w.severity)} {w.severity.value.upper()}: {w.message}"
-                for w in warnings
-            ]
+            [f"{w.icon} {w.severity.value.upper()}: {w.message}" for w in warnings]
         )
     else:
         warnings_md = "No warnings - changes appear safe ✅"
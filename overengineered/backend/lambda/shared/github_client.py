@@ -4,7 +4,7 @@ Handles authentication, file fetching, and error handling.
 """
 
 from functools import lru_cache
-from typing import Optional
+from typing import Callable, FrozenSet, Optional, TypeVar
 import os
 import time
 import logging
@@ -26,6 +26,8 @@ MAX_RETRIES = 3
 INITIAL_BACKOFF = 1  # seconds
 BACKOFF_MULTIPLIER = 2
 
+T = TypeVar("T")
+
 
 class GitHubError(Exception):
     """Base exception for GitHub client errors."""
@@ -177,6 +179,22 @@ def get_github_client() -> Github:
         )
 
 
+@lru_cache(maxsize=1)
+def _parse_allowed_repos(allowed_repos_str: str) -> FrozenSet[str]:
+    """
+    Parse the comma-separated ALLOWED_REPOS value into a set of repo names.
+
+    Cached on the raw string, so a changed environment value is re-parsed.
+
+    Args:
+        allowed_repos_str: Raw ALLOWED_REPOS value (e.g., "owner/a, owner/b")
+
+    Returns:
+        FrozenSet[str]: Repository names with surrounding whitespace stripped
+    """
+    return frozenset(repo.strip() for repo in allowed_repos_str.split(","))
+
+
 def _validate_repository_whitelist(repo_name: str) -> None:
     """
     Validate repository is in ALLOWED_REPOS whitelist.
@@ -201,19 +219,59 @@ def _validate_repository_whitelist(repo_name: str) -> None:
         logger.warning("ALLOWED_REPOS not set - all repositories allowed (insecure!)")
         return
 
-    allowed_repos = [repo.strip() for repo in allowed_repos_str.split(",")]
+    allowed_repos = _parse_allowed_repos(allowed_repos_str)
 
     if repo_name not in allowed_repos:
         logger.warning(
             f"Repository not in whitelist: {repo_name} "
-            f"(allowed: {', '.join(allowed_repos)})"
+            f"(allowed: {', '.join(sorted(allowed_repos))})"
         )
         raise RepositoryNotFoundError(repo_name)
 
     logger.debug(f"Repository whitelist check passed: {repo_name}")
 
 
-def fetch_spec_file(repo_name: str, file_path: str, ref: str = "main") -> str:
+def _retry_with_backoff(
+    op: Callable[[], T],
+    retries: int = MAX_RETRIES,
+    sleep: Callable[[float], None] = time.sleep,
+) -> T:
+    """
+    Call op(), retrying on GitHub rate limits with exponential backoff.
+
+    Args:
+        op: Zero-argument callable to invoke
+        retries: Number of retries after the first attempt (default: MAX_RETRIES)
+        sleep: Called with the backoff in seconds between attempts
+
+    Returns:
+        Whatever op() returns
+
+    Raises:
+        RateLimitExceededException: If still rate limited after all retries
+        Exception: Any other exception from op() is raised immediately
+    """
+    for attempt in range(retries):
+        try:
+            return op()
+        except RateLimitExceededException:
+            backoff = INITIAL_BACKOFF * (BACKOFF_MULTIPLIER**attempt)
+            logger.warning(
+                f"Rate limit exceeded, retrying in {backoff}s "
+                f"(attempt {attempt + 1}/{retries})"
+            )
+            sleep(backoff)
+
+    # Final attempt: let a rate limit propagate to the caller
+    return op()
+
+
+def fetch_spec_file(
+    repo_name: str,
+    file_path: str,
+    ref: str = "main",
+    sleep: Callable[[float], None] = time.sleep,
+) -> str:
     """
     Fetch ActionSpec YAML file content from GitHub repository.
 
@@ -221,6 +279,8 @@ def fetch_spec_file(repo_name: str, file_path: str, ref: str = "main") -> str:
         repo_name: Repository in format "owner/repo" (e.g., "trakrf/action-spec")
         file_path: Path to spec file (e.g., "specs/examples/secure-web-waf.spec.yml")
         ref: Git ref (branch/tag/commit, default: 'main')
+        sleep: Called with the backoff in seconds between rate-limit retries
+            (default: time.sleep; tests can pass e.g. a list's append)
 
     Returns:
         str: Decoded file content (UTF-8)
@@ -249,64 +309,54 @@ def fetch_spec_file(repo_name: str, file_path: str, ref: str = "main") -> str:
     # Get authenticated client
     client = get_github_client()
 
-    # Fetch file with retry logic
-    for attempt in range(MAX_RETRIES + 1):
+    def _fetch() -> str:
+        # Get repository
         try:
-            # Get repository
-            try:
-                repo = client.get_repo(repo_name)
-            except UnknownObjectException:
-                raise RepositoryNotFoundError(repo_name)
-
-            # Get file contents
-            try:
-                file_content = repo.get_contents(file_path, ref=ref)
-            except UnknownObjectException:
-                raise FileNotFoundError(repo_name, file_path, ref)
-
-            # Decode content (PyGithub returns base64-encoded)
-            if hasattr(file_content, "decoded_content"):
-                content = file_content.decoded_content.decode("utf-8")
-            else:
-                # Handle case where file_content is a list (directory)
-                raise FileNotFoundError(repo_name, file_path, ref)
-
-            logger.info(
-                f"Successfully fetched file: {file_path} from {repo_name} "
-                f"(ref: {ref}, size: {len(content)} bytes)"
-            )
+            repo = client.get_repo(repo_name)
+        except UnknownObjectException:
+            raise RepositoryNotFoundError(repo_name)
+
+        # Get file contents
+        try:
+            file_content = repo.get_contents(file_path, ref=ref)
+        except UnknownObjectException:
+            raise FileNotFoundError(repo_name, file_path, ref)
+
+        # Decode content (PyGithub returns base64-encoded)
+        if hasattr(file_content, "decoded_content"):
+            content = file_content.decoded_content.decode("utf-8")
+        else:
+            # Handle case where file_content is a list (directory)
+            raise FileNotFoundError(repo_name, file_path, ref)
+
+        logger.info(
+            f"Successfully fetched file: {file_path} from {repo_name} "
+            f"(ref: {ref}, size: {len(content)} bytes)"
+        )
+
+        return content
+
+    # Fetch file with retry logic
+    try:
+        return _retry_with_backoff(_fetch, sleep=sleep)
 
-            return content
-
-        except RateLimitExceededException as e:
-            # Check if we have retries left
-            if attempt < MAX_RETRIES:
-                backoff = INITIAL_BACKOFF * (BACKOFF_MULTIPLIER**attempt)
-                logger.warning(
-                    f"Rate limit exceeded, retrying in {backoff}s "
-                    f"(attempt {attempt + 1}/{MAX_RETRIES})"
-                )
-                time.sleep(backoff)
-            else:
-                # Get retry_after from rate limit
-                rate_limit = client.get_rate_limit()
-                reset_timestamp = rate_limit.core.reset.timestamp()  # type: ignore[attr-defined]
-                retry_after = int(reset_timestamp - time.time())
-
-                raise RateLimitError(
-                    f"Exhausted {MAX_RETRIES} retries", retry_after=max(retry_after, 0)
-                )
-
-        except (FileNotFoundError, RepositoryNotFoundError, ValueError):
-            # Don't retry these errors
-            raise
-
-        except Exception as e:
-            logger.error(f"Unexpected error fetching file: {e}")
-            raise GitHubError(f"Failed to fetch file: {type(e).__name__}: {str(e)}")
-
-    # Should never reach here
-    raise GitHubError("Unexpected error in fetch_spec_file retry loop")
+    except RateLimitExceededException:
+        # Get retry_after from rate limit
+        rate_limit = client.get_rate_limit()
+        reset_timestamp = rate_limit.core.reset.timestamp()  # type: ignore[attr-defined]
+        retry_after = int(reset_timestamp - time.time())
+
+        raise RateLimitError(
+            f"Exhausted {MAX_RETRIES} retries", retry_after=max(retry_after, 0)
+        )
+
+    except (FileNotFoundError, RepositoryNotFoundError, ValueError):
+        # Don't retry these errors
+        raise
+
+    except Exception as e:
+        logger.error(f"Unexpected error fetching file: {e}")
+        raise GitHubError(f"Failed to fetch file: {type(e).__name__}: {str(e)}")
 
 
 def create_branch(repo_name: str, branch_name: str, base_ref: str = "main") -> str:
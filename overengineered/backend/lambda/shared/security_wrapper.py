@@ -13,14 +13,19 @@ Usage:
 import json
 import logging
 import os
+import re
+import sys
 import traceback
-from functools import wraps
-from typing import Any, Callable, Dict, Set
+from functools import update_wrapper
+from typing import Any, Callable, Dict, FrozenSet, Tuple
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
+# Deployment environment (fixed for the lifetime of the Lambda container)
+ENVIRONMENT = os.environ.get("ENVIRONMENT", "unknown")
+
 # Security headers applied to ALL responses
 SECURITY_HEADERS = {
     "Strict-Transport-Security": "max-age=63072000; includeSubDomains",
@@ -33,54 +38,138 @@ SECURITY_HEADERS = {
     "Content-Type": "application/json",
 }
 
+# Body used when a handler returns no body
+DEFAULT_BODY = json.dumps({"message": "OK"})
+
+# Constant error bodies, serialized once per container
+SUSPICIOUS_REQUEST_BODY = json.dumps(
+    {"error": "Invalid request", "message": "Request pattern not allowed"}
+)
+INTERNAL_ERROR_BODY = json.dumps(
+    {"error": "Internal server error", "message": "An unexpected error occurred"}
+)
+
 # Fields to NEVER log (case-insensitive matching)
-SENSITIVE_FIELDS: Set[str] = {
-    "authorization",
-    "x-api-key",
-    "cookie",
-    "password",
-    "secret",
-    "token",
-    "aws",
-    "key",
-    "credential",
-}
+SENSITIVE_FIELDS: FrozenSet[str] = frozenset(
+    {
+        "authorization",
+        "x-api-key",
+        "cookie",
+        "password",
+        "secret",
+        "token",
+        "aws",
+        "key",
+        "credential",
+    }
+)
+
+# Substring form of SENSITIVE_FIELDS, so a key like "github_token" is caught
+# with one regex scan instead of a Python-level loop over the denylist
+_SENSITIVE_KEY_RE = re.compile("|".join(map(re.escape, sorted(SENSITIVE_FIELDS))))
+
+# Common SQL injection patterns in query strings (case-insensitive literals)
+SQL_INJECTION_PATTERNS = ("union select", "drop table", "--", "/*", "xp_cmdshell")
+
+# All SQL patterns as one alternation, compiled once per container, so the
+# regex engine scans the query string in a single pass
+_SQL_INJECTION_RE = re.compile(
+    "|".join(map(re.escape, SQL_INJECTION_PATTERNS)), re.IGNORECASE
+)
+
+# Parent-directory segment in either separator style
+_PATH_TRAVERSAL_RE = re.compile(r"\.\.[/\\]")
+
+
+def _is_sensitive_key(key: str) -> bool:
+    """
+    Check whether a dict key names a field that must not be logged.
+
+    Args:
+        key: Dict key to check (case-insensitive)
+
+    Returns:
+        True if the key is, or contains, a SENSITIVE_FIELDS entry
+    """
+    lowered = key.lower()
+    return lowered in SENSITIVE_FIELDS or _SENSITIVE_KEY_RE.search(lowered) is not None
 
 
 def sanitize_for_logging(data: Any, depth: int = 0) -> Any:
     """
-    Recursively sanitize data structure for safe logging.
+    Sanitize data structure for safe logging.
     Redacts sensitive fields.
 
+    Walks nested dicts/lists with an explicit stack rather than recursion,
+    so no Python frame is pushed per node. A subtree referenced from several
+    places at the same depth is sanitized once and the copy is shared.
+
     Args:
         data: Data structure to sanitize (dict, list, or primitive)
-        depth: Current recursion depth (prevents infinite loops)
+        depth: Starting depth (nodes deeper than 10 are replaced)
 
     Returns:
         Sanitized copy of data
     """
-    if depth > 10:  # Prevent deep recursion
-        return "[MAX_DEPTH_EXCEEDED]"
-
-    if isinstance(data, dict):
-        sanitized = {}
-        for key, value in data.items():
-            # Check if key matches sensitive pattern
-            if any(sensitive in key.lower() for sensitive in SENSITIVE_FIELDS):
-                sanitized[key] = "[REDACTED]"
-            else:
-                sanitized[key] = sanitize_for_logging(value, depth + 1)
-        return sanitized
+    # Each entry is (container, slot, value, depth): the sanitized value is
+    # written to container[slot]. The root lives in a one-element list.
+    result: list = [None]
+    stack = [(result, 0, data, depth)]
 
-    elif isinstance(data, list):
-        return [sanitize_for_logging(item, depth + 1) for item in data]
+    # Sanitized containers keyed by (id(source), depth). Every source object
+    # is reachable from `data` for the whole call, so ids cannot be reused.
+    memo: Dict[Tuple[int, int], Any] = {}
 
-    elif isinstance(data, str) and len(data) > 1000:
-        # Truncate very long strings
-        return data[:1000] + "...[TRUNCATED]"
+    while stack:
+        parent, slot, value, level = stack.pop()
 
-    else:
-        return data
+        if level > 10:  # Prevent unbounded nesting (and reference cycles)
+            parent[slot] = "[MAX_DEPTH_EXCEEDED]"
+
+        elif (id(value), level) in memo:
+            parent[slot] = memo[(id(value), level)]
+
+        elif isinstance(value, dict):
+            sanitized = {}
+            parent[slot] = memo[(id(value), level)] = sanitized
+            for key, child in value.items():
+                # Check if key matches sensitive pattern
+                if _is_sensitive_key(key):
+                    sanitized[key] = "[REDACTED]"
+                else:
+                    sanitized[key] = None  # Reserve slot to keep key order
+                    stack.append((sanitized, key, child, level + 1))
+
+        elif isinstance(value, list):
+            sanitized_list: list = [None] * len(value)
+            parent[slot] = memo[(id(value), level)] = sanitized_list
+            for index, item in enumerate(value):
+                stack.append((sanitized_list, index, item, level + 1))
+
+        elif isinstance(value, str) and len(value) > 1000:
+            # Truncate very long strings
+            parent[slot] = value[:1000] + "...[TRUNCATED]"
+
+        else:
+            parent[slot] = value
+
+    return result[0]
+
+
+def _emit(level: str, msg: str, **fields: Any) -> None:
+    """
+    Write one structured JSON log line to stdout (captured by CloudWatch).
+    Skips the logging Formatter/Handler chain on the per-request path.
+
+    Args:
+        level: Log level name (e.g. "INFO", "WARNING")
+        msg: Human-readable message
+        **fields: Additional structured fields to include in the line
+    """
+    sys.stdout.write(
+        json.dumps({"level": level, "msg": msg, **fields}, default=str) + "\n"
+    )
+    sys.stdout.flush()
 
 
 def is_suspicious_request(event: Dict[str, Any]) -> bool:
@@ -94,82 +183,60 @@ def is_suspicious_request(event: Dict[str, Any]) -> bool:
         True if request looks suspicious
     """
     # Check for common SQL injection patterns in query strings
-    if "queryStringParameters" in event and event["queryStringParameters"]:
-        query_string = str(event["queryStringParameters"]).lower()
-        sql_patterns = ["union select", "drop table", "--", "/*", "xp_cmdshell"]
-        if any(pattern in query_string for pattern in sql_patterns):
-            return True
+    query_params = event.get("queryStringParameters")
+    if query_params and _SQL_INJECTION_RE.search(str(query_params)):
+        return True
 
     # Check for path traversal attempts
-    if "path" in event:
-        path = event["path"]
-        if "../" in path or "..\\" in path:
-            return True
+    path = event.get("path")
+    if path and _PATH_TRAVERSAL_RE.search(path):
+        return True
 
     return False
 
 
-def secure_handler(func: Callable) -> Callable:
-    """
-    Decorator that adds security features to Lambda handlers.
+class _SecureHandler:
+    """Callable wrapper produced by secure_handler (see its docstring)."""
 
-    Features:
-    - Automatic security header injection
-    - Request sanitization logging
-    - Suspicious request detection
-    - Exception wrapping with safe error messages
-    - Environment-based debug logging
+    # Slot for the hot-path handler reference; __dict__ keeps functools
+    # metadata (__name__, __doc__, __wrapped__) assignable
+    __slots__ = ("_func", "__dict__")
 
-    Usage:
-        @secure_handler
-        def lambda_handler(event, context):
-            return {'statusCode': 200, 'body': json.dumps({'message': 'OK'})}
-    """
+    def __init__(self, func: Callable):
+        self._func = func
+        update_wrapper(self, func)
+
+    def __call__(self, event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+        request_id = getattr(context, "request_id", "local")
 
-    @wraps(func)
-    def wrapper(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         # Sanitize event for logging
         safe_event = sanitize_for_logging(event)
 
         # Log request (sanitized)
-        environment = os.environ.get("ENVIRONMENT", "unknown")
-        logger.info(
-            f"Request received [env={environment}]",
-            extra={
-                "event": safe_event,
-                "request_id": (
-                    context.request_id if hasattr(context, "request_id") else "local"
-                ),
-            },
+        _emit(
+            "INFO",
+            f"Request received [env={ENVIRONMENT}]",
+            request_id=request_id,
+            event=safe_event,
         )
 
         # Check for suspicious patterns
         if is_suspicious_request(event):
-            logger.warning(
+            _emit(
+                "WARNING",
                 "Suspicious request detected",
-                extra={
-                    "event": safe_event,
-                    "request_id": (
-                        context.request_id
-                        if hasattr(context, "request_id")
-                        else "local"
-                    ),
-                },
+                request_id=request_id,
+                event=safe_event,
             )
             return {
                 "statusCode": 418,  # I'm a teapot
                 "headers": SECURITY_HEADERS,
-                "body": json.dumps(
-                    {
-                        "error": "Invalid request",
-                        "message": "Request pattern not allowed",
-                    }
-                ),
+                "body": SUSPICIOUS_REQUEST_BODY,
             }
 
         try:
             # Call the actual handler
-            response = func(event, context)
+            response = self._func(event, context)
 
             # Ensure response has proper structure
             if not isinstance(response, dict):
@@ -178,68 +245,93 @@ def secure_handler(func: Callable) -> Callable:
             if "statusCode" not in response:
                 response["statusCode"] = 200
 
-            if "body" not in response:
-                response["body"] = json.dumps({"message": "OK"})
-
-            # Ensure body is string (Lambda requirement)
-            if isinstance(response.get("body"), dict):
-                response["body"] = json.dumps(response["body"])
-
-            # Inject security headers (merge with any existing headers)
-            if "headers" not in response:
-                response["headers"] = {}
-
-            response["headers"].update(SECURITY_HEADERS)
+            # Handlers return string bodies (Lambda requirement); anything
+            # else is serialized as a fallback and flagged in local dev
+            body = response.get("body")
+            if body is None:
+                response["body"] = DEFAULT_BODY
+            elif type(body) is not str:
+                if ENVIRONMENT == "local":
+                    _emit(
+                        "WARNING",
+                        f"Handler returned {type(body).__name__} body, expected str",
+                        request_id=request_id,
+                    )
+                response["body"] = json.dumps(body)
+
+            # Inject security headers (merge with any existing headers; the
+            # security values win so handlers cannot weaken them)
+            headers = response.get("headers")
+            if headers is None:
+                response["headers"] = dict(SECURITY_HEADERS)
+            else:
+                headers.update(SECURITY_HEADERS)
 
             # Log response (sanitized, status only in production)
-            if environment == "local":
-                logger.info(
+            if ENVIRONMENT == "local":
+                _emit(
+                    "INFO",
                     f"Response: {response['statusCode']}",
-                    extra={
-                        "status": response["statusCode"],
-                        "headers": response["headers"],
-                    },
+                    request_id=request_id,
+                    status=response["statusCode"],
+                    headers=response["headers"],
                 )
             else:
-                logger.info(f"Response: {response['statusCode']}")
+                _emit(
+                    "INFO",
+                    f"Response: {response['statusCode']}",
+                    request_id=request_id,
+                )
 
             return response
 
         except Exception as e:
-            # Log exception with full traceback
-            logger.error(
-                f"Handler error: {str(e)}",
-                extra={
-                    "error_type": type(e).__name__,
-                    "traceback": traceback.format_exc(),
-                },
-            )
+            # Format the traceback once, and only where it is surfaced (local dev)
+            tb = traceback.format_exc() if ENVIRONMENT == "local" else None
+
+            # Log exception
+            extra = {"error_type": type(e).__name__}
+            if tb is not None:
+                extra["traceback"] = tb
+            logger.error(f"Handler error: {str(e)}", extra=extra)
 
             # Return safe error response (never leak internal details)
             error_response = {
                 "statusCode": 500,
                 "headers": SECURITY_HEADERS,
-                "body": json.dumps(
-                    {
-                        "error": "Internal server error",
-                        "message": "An unexpected error occurred",
-                    }
-                ),
+                "body": INTERNAL_ERROR_BODY,
             }
 
             # In local development, include error details
-            if environment == "local":
+            if ENVIRONMENT == "local":
                 error_response["body"] = json.dumps(
                     {
                         "error": type(e).__name__,
                         "message": str(e),
-                        "traceback": traceback.format_exc(),
+                        "traceback": tb,
                     }
                 )
 
             return error_response
 
-    return wrapper
+
+def secure_handler(func: Callable) -> Callable:
+    """
+    Decorator that adds security features to Lambda handlers.
+
+    Features:
+    - Automatic security header injection
+    - Request sanitization logging
+    - Suspicious request detection
+    - Exception wrapping with safe error messages
+    - Environment-based debug logging
+
+    Usage:
+        @secure_handler
+        def lambda_handler(event, context):
+            return {'statusCode': 200, 'body': json.dumps({'message': 'OK'})}
+    """
+    return _SecureHandler(func)
 
 
 # Example usage (for testing)
@@ -19,9 +19,17 @@ class Severity(str, Enum):
     CRITICAL = "critical"
 
 
-@dataclass
+# Display icon per severity (matches the prefix used in warning messages)
+SEVERITY_ICONS = {
+    Severity.INFO: "ℹ️",
+    Severity.WARNING: "⚠️",
+    Severity.CRITICAL: "🔴",
+}
+
+
+@dataclass(frozen=True, slots=True)
 class ChangeWarning:
-    """Structured warning with severity and display message."""
+    """Structured warning with severity and display message (immutable)."""
 
     severity: Severity
     message: str
@@ -31,6 +39,11 @@ class ChangeWarning:
         """Return emoji + message for display."""
         return self.message
 
+    @property
+    def icon(self) -> str:
+        """Return the display icon for this warning's severity."""
+        return SEVERITY_ICONS.get(self.severity, "•")
+
 
 def check_destructive_changes(old_spec: dict, new_spec: dict) -> List[ChangeWarning]:
     """
@@ -52,6 +65,10 @@ def check_destructive_changes(old_spec: dict, new_spec: dict) -> List[ChangeWarn
         >>> warnings[0].severity
         <Severity.WARNING: 'warning'>
     """
+    # Same object on both sides: nothing can have changed
+    if old_spec is new_spec:
+        return []
+
     warnings = []
 
     # Detect changes across all categories